@@ -5,7 +5,7 @@ MongoDB helper functions ready to use in your backend code.
 Import and use these functions in your API endpoints for database operations.
 """
 
-from pymongo import MongoClient
+from motor.motor_asyncio import AsyncIOMotorClient
 from datetime import datetime, timezone
 import os
 from dotenv import load_dotenv
@@ -21,13 +21,37 @@ db = None
 database_url = os.getenv("DATABASE_URL")
 database_name = os.getenv("DATABASE_NAME")
 
-if database_url and database_name:
-    _client = MongoClient(database_url)
-    db = _client[database_name]
+def get_db():
+    """Return the database handle, creating the client on first use.
+
+    The app calls this from its startup hook so every worker process builds its
+    own connection pool after forking.
+    """
+    global _client, db
+    if db is None and database_url and database_name:
+        _client = AsyncIOMotorClient(
+            database_url,
+            maxPoolSize=int(os.getenv("MONGO_MAX_POOL_SIZE", "200")),
+            minPoolSize=int(os.getenv("MONGO_MIN_POOL_SIZE", "10")),
+            waitQueueTimeoutMS=int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "2000")),
+            serverSelectionTimeoutMS=int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "2000")),
+            retryWrites=True,
+        )
+        db = _client[database_name]
+    return db
+
+def close_db():
+    """Close the client and its pooled connections"""
+    global _client, db
+    if _client is not None:
+        _client.close()
+    _client = None
+    db = None
 
 # Helper functions for common database operations
-def create_document(collection_name: str, data: Union[BaseModel, dict]):
+async def create_document(collection_name: str, data: Union[BaseModel, dict]):
     """Insert a single document with timestamp"""
+    db = get_db()
     if db is None:
         raise Exception("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
 
@@ -40,16 +64,30 @@ def create_document(collection_name: str, data: Union[BaseModel, dict]):
     data_dict['created_at'] = datetime.now(timezone.utc)
     data_dict['updated_at'] = datetime.now(timezone.utc)
 
-    result = db[collection_name].insert_one(data_dict)
+    result = await db[collection_name].insert_one(data_dict)
     return str(result.inserted_id)
 
-def get_documents(collection_name: str, filter_dict: dict = None, limit: int = None):
-    """Get documents from collection"""
+async def get_documents(collection_name: str, filter_dict: dict = None, limit: int = None, projection: dict = None):
+    """Get documents from collection, optionally returning only the projected fields"""
+    db = get_db()
     if db is None:
         raise Exception("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
     
-    cursor = db[collection_name].find(filter_dict or {})
+    cursor = db[collection_name].find(filter_dict or {}, projection)
     if limit:
         cursor = cursor.limit(limit)
     
-    return list(cursor)
+    return await cursor.to_list(length=None)
+
+async def ensure_indexes():
+    """Create the indexes used by the booking endpoints (no-op if they already exist)
+
+    createIndexes only returns once the build has finished, which can take a while
+    on a large existing collection; callers should not await this on a hot path.
+    """
+    db = get_db()
+    if db is None:
+        return
+
+    await db["roomtype"].create_index("property_id")
+    await db["reservation"].create_index([("room_type_id", 1), ("check_in", 1), ("check_out", 1)])
@@ -1,38 +1,120 @@
+import asyncio
+import base64
+import functools
+import hashlib
+import json
 import os
-from datetime import datetime, timedelta, date
-from typing import List, Optional
-
-from fastapi import FastAPI, HTTPException
+import secrets
+import time
+from dataclasses import dataclass
+from datetime import timedelta, date
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+from bson import ObjectId
+from cachetools import TTLCache
+from fastapi import BackgroundTasks, FastAPI, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, EmailStr
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, EmailStr, Field
 
-from database import db, create_document, get_documents
+from database import close_db, create_document, ensure_indexes, get_db, get_documents
 from schemas import (
-    Property, RoomType, Reservation, ReservationGuest,
+    Property, RoomType, ReservationGuest,
     AvailabilitySearch, AvailabilityResult, AvailabilityResultItem,
     CreatePropertyRequest, CreateRoomTypeRequest, CreateReservationRequest,
     EmailNotification,
 )
 
+import jinja2
 import smtplib
-from email.mime.text import MIMEText
-
-app = FastAPI(title="Booking Engine API")
-
+import threading
+from email.header import Header
+from email.utils import formataddr, parseaddr
+
+@dataclass(frozen=True)
+class Settings:
+    """App, SMTP and notification configuration, resolved once from the environment at import."""
+    frontend_origins: Tuple[str, ...]
+    smtp_host: Optional[str]
+    smtp_port: int
+    smtp_user: Optional[str]
+    smtp_pass: Optional[str]
+    smtp_sender: str
+    smtp_max_messages_per_connection: int
+    email_max_batch: int
+    email_flush_interval_ms: int
+    booking_notification_email: Optional[str]
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        user = os.getenv("SMTP_USER")
+        return cls(
+            frontend_origins=tuple(o.strip() for o in os.getenv("FRONTEND_ORIGIN", "*").split(",") if o.strip()),
+            smtp_host=os.getenv("SMTP_HOST"),
+            smtp_port=int(os.getenv("SMTP_PORT", "587")),
+            smtp_user=user,
+            smtp_pass=os.getenv("SMTP_PASS"),
+            smtp_sender=os.getenv("SMTP_SENDER", user or "no-reply@example.com"),
+            smtp_max_messages_per_connection=int(os.getenv("SMTP_MAX_MESSAGES_PER_CONNECTION", "100")),
+            email_max_batch=int(os.getenv("EMAIL_MAX_BATCH", "50")),
+            email_flush_interval_ms=int(os.getenv("EMAIL_FLUSH_INTERVAL_MS", "200")),
+            booking_notification_email=os.getenv("BOOKING_NOTIFICATION_EMAIL"),
+        )
+
+SETTINGS = Settings.from_env()
+
+app = FastAPI(title="Booking Engine API", default_response_class=ORJSONResponse)
+
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+# CORS is added last so it is the outermost layer and answers preflights before compression
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
+    allow_origins=list(SETTINGS.frontend_origins),
+    allow_credentials=False,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
+# Index builds run as a background task so workers start serving immediately
+# instead of waiting for createIndexes to finish on a large collection.
+_index_build: Optional[asyncio.Task] = None
+
+def _log_index_build(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        print("Index creation error:", task.exception())
+
+@app.on_event("startup")
+async def connect_database():
+    global _index_build
+    # Build the Mongo client here rather than at import so it is created post-fork
+    get_db()
+    _index_build = asyncio.create_task(ensure_indexes())
+    _index_build.add_done_callback(_log_index_build)
+
+@app.on_event("shutdown")
+async def disconnect_database():
+    global _index_build
+    if _index_build is not None and not _index_build.done():
+        # Stops waiting on the build; the server finishes it regardless
+        _index_build.cancel()
+    _index_build = None
+    close_db()
+
 @app.get("/")
 def read_root():
     return {"message": "Booking Engine Backend Running"}
 
-@app.get("/test")
-def test_database():
+@app.get("/livez")
+def liveness():
+    # Process is up; never touches the database
+    return {"status": "ok"}
+
+async def _probe_database() -> Tuple[dict, bool]:
+    """Return the /test report and whether the database answered a query."""
+    healthy = False
     response = {
         "backend": "✅ Running",
         "database": "❌ Not Available",
@@ -42,15 +124,17 @@ def test_database():
         "collections": []
     }
     try:
+        db = get_db()
         if db is not None:
             response["database"] = "✅ Available"
             response["database_url"] = "✅ Configured"
             response["database_name"] = db.name if hasattr(db, 'name') else "✅ Connected"
             response["connection_status"] = "Connected"
             try:
-                collections = db.list_collection_names()
+                collections = await db.list_collection_names()
                 response["collections"] = collections[:10]
                 response["database"] = "✅ Connected & Working"
+                healthy = True
             except Exception as e:
                 response["database"] = f"⚠️  Connected but Error: {str(e)[:50]}"
         else:
@@ -60,73 +144,381 @@ def test_database():
 
     response["database_url"] = "✅ Set" if os.getenv("DATABASE_URL") else "❌ Not Set"
     response["database_name"] = "✅ Set" if os.getenv("DATABASE_NAME") else "❌ Not Set"
-    return response
+    return response, healthy
+
+# Probes (load balancers, Kubernetes) can hit these often; share one database
+# round-trip across all of them every few seconds.
+_health_cache: TTLCache = TTLCache(maxsize=1, ttl=5)
+
+@app.get("/test")
+async def test_database(request: Request, response: Response):
+    (report, _), etag = await _cached(_health_cache, "database", _probe_database, lambda r: r[0])
+    return _not_modified(request, response, etag) or report
+
+@app.get("/readyz")
+async def readiness():
+    (report, healthy), _ = await _cached(_health_cache, "database", _probe_database, lambda r: r[0])
+    if not healthy:
+        return ORJSONResponse({"status": "unavailable", "database": report["database"]}, status_code=503)
+    return {"status": "ready"}
 
 # Utility
 
+# Epoch seconds followed by six random digits, so two bookings made in the same
+# second don't collide on a code.
+_CODE_FMT = "{}-{:010d}{:06d}".format
+
 def generate_confirmation_code(prefix: str = "RES") -> str:
-    return f"{prefix}-{datetime.utcnow().strftime('%Y%m%d%H%M%S')}"
+    return _CODE_FMT(prefix, time.time_ns() // 1_000_000_000, secrets.randbelow(1_000_000))
+
+# Reservation notification body, compiled once. Autoescaping keeps guest-supplied
+# fields (names, email) from injecting markup into the message.
+_RESERVATION_EMAIL_TMPL = jinja2.Template("""
+    <h2>{{ title }}</h2>
+    <p><strong>Confirmation:</strong> {{ res.confirmation_code }}</p>
+    <p><strong>Property:</strong> {{ res.property_id }}</p>
+    <p><strong>Room Type:</strong> {{ res.room_type_id }}</p>
+    <p><strong>Dates:</strong> {{ res.check_in }} to {{ res.check_out }} ({{ nights }} nights)</p>
+    <p><strong>Guest:</strong> {{ res.guest.first_name }} {{ res.guest.last_name }} ({{ res.guest.email }})</p>
+    <p><strong>Total:</strong> {{ res.total_price }} {{ res.currency }}</p>
+    <p><strong>Channel:</strong> {{ res.channel }}</p>
+    """, autoescape=True)
 
 # Email sending helper (simple SMTP). In this environment, we'll attempt to use SMTP_HOST/PORT/USER/PASS env vars.
 
-def send_email(notification: EmailNotification) -> bool:
-    host = os.getenv("SMTP_HOST")
-    port = int(os.getenv("SMTP_PORT", "587"))
-    user = os.getenv("SMTP_USER")
-    password = os.getenv("SMTP_PASS")
-    sender = os.getenv("SMTP_SENDER", user or "no-reply@example.com")
+class SMTPConnectionPool:
+    """Keeps one authenticated SMTP connection per thread and reuses it across sends.
 
-    if not host:
-        # SMTP not configured, simulate success (log only)
-        print(f"[Email] To: {notification.to} | Subject: {notification.subject}\n{notification.body}")
-        return True
+    Connections are recycled after ``max_messages`` sends to stay under server-side
+    per-connection limits, and rebuilt once if the server drops them mid-send.
+    """
 
+    def __init__(self, host: str, port: int, user: Optional[str], password: Optional[str], max_messages: int = 100):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.max_messages = max_messages
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = set()
+
+    def _connect(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(self.host, self.port, timeout=10)
+        server.starttls()
+        if self.user and self.password:
+            server.login(self.user, self.password)
+        with self._lock:
+            self._connections.add(server)
+        self._local.server = server
+        self._local.sent = 0
+        return server
+
+    @staticmethod
+    def _close(server: smtplib.SMTP) -> None:
+        try:
+            server.quit()
+        except Exception:
+            server.close()
+
+    def reset(self) -> None:
+        """Drop the current thread's connection; the next send reconnects."""
+        server = getattr(self._local, "server", None)
+        self._local.server = None
+        if server is not None:
+            with self._lock:
+                self._connections.discard(server)
+            self._close(server)
+
+    def shutdown(self) -> None:
+        """Close every open connection (called on application shutdown)."""
+        with self._lock:
+            connections, self._connections = self._connections, set()
+        for server in connections:
+            self._close(server)
+
+    @staticmethod
+    def _sendmail(server: smtplib.SMTP, sender: str, recipients: List[str], msg: bytes) -> None:
+        # Internationalised mailboxes need SMTPUTF8; smtplib raises SMTPNotSupportedError
+        # if the server doesn't advertise it.
+        needs_utf8 = not (sender.isascii() and all(r.isascii() for r in recipients))
+        server.sendmail(sender, recipients, msg, mail_options=["SMTPUTF8"] if needs_utf8 else [])
+
+    def send(self, sender: str, recipients: List[str], msg: bytes) -> None:
+        server = getattr(self._local, "server", None)
+        if server is not None and self._local.sent >= self.max_messages:
+            self.reset()
+            server = None
+        try:
+            if server is None:
+                server = self._connect()
+            self._sendmail(server, sender, recipients, msg)
+        except smtplib.SMTPNotSupportedError:
+            # Server can't take this message (e.g. no SMTPUTF8); reconnecting won't help
+            raise
+        except (smtplib.SMTPException, OSError):
+            # Stale or dropped connection: reconnect and retry once
+            self.reset()
+            server = self._connect()
+            self._sendmail(server, sender, recipients, msg)
+        self._local.sent += 1
+
+def _idna_address(address: str) -> str:
+    """IDNA-encode the domain so a mailbox like ``a@bücher.de`` stays plain ASCII."""
+    local, _, domain = address.rpartition("@")
     try:
-        msg = MIMEText(notification.body, "html")
-        msg["Subject"] = notification.subject
-        msg["From"] = sender
-        msg["To"] = notification.to
-
-        with smtplib.SMTP(host, port, timeout=10) as server:
-            server.starttls()
-            if user and password:
-                server.login(user, password)
-            server.send_message(msg)
+        return f"{local}@{domain.encode('idna').decode('ascii')}"
+    except UnicodeError:
+        return address
+
+@functools.lru_cache(maxsize=None)
+def _email_skeleton(sender: str) -> Tuple[str, str]:
+    """Envelope address and the headers shared by every message from ``sender``.
+
+    Messages are assembled as raw bytes so each send only formats Subject, To
+    and the body; this block is serialised once per sender.
+    """
+    name, address = parseaddr(sender)
+    address = _idna_address(address)
+    headers = (
+        f"From: {formataddr((name, address), charset='utf-8')}\r\n"
+        "MIME-Version: 1.0\r\n"
+        'Content-Type: text/html; charset="utf-8"\r\n'
+        "Content-Transfer-Encoding: base64\r\n"
+    )
+    return address, headers
+
+def _render_message(skeleton: str, subject: str, to: str, body: str) -> bytes:
+    if not (subject.isascii() and subject.isprintable()):
+        # RFC 2047-encode non-ASCII subjects; this also keeps CR/LF out of the header block
+        subject = Header(subject, "utf-8").encode(linesep="\r\n")
+    headers = f"Subject: {subject}\r\nTo: {to}\r\n{skeleton}\r\n"
+    # Headers are ASCII except for internationalised mailboxes, which are sent raw under SMTPUTF8
+    return headers.encode("utf-8") + base64.encodebytes(body.encode("utf-8")).replace(b"\n", b"\r\n")
+
+smtp_pool = SMTPConnectionPool(
+    SETTINGS.smtp_host, SETTINGS.smtp_port, SETTINGS.smtp_user, SETTINGS.smtp_pass,
+    max_messages=SETTINGS.smtp_max_messages_per_connection,
+)
+
+def send_emails(notifications: List[EmailNotification]) -> bool:
+    """Send a batch of notifications over the pooled connection.
+
+    Notifications sharing a subject and body are collapsed into one message
+    whose recipients only appear in the SMTP envelope (an implicit Bcc).
+    """
+    if not SETTINGS.smtp_host:
+        # SMTP not configured, simulate success (log only)
+        for notification in notifications:
+            print(f"[Email] To: {notification.to} | Subject: {notification.subject}\n{notification.body}")
         return True
-    except Exception as e:
-        print("Email error:", e)
-        return False
+
+    sender, skeleton = _email_skeleton(SETTINGS.smtp_sender)
+    groups: Dict[Tuple[str, str], List[str]] = {}
+    for notification in notifications:
+        groups.setdefault((notification.subject, notification.body), []).append(_idna_address(notification.to))
+
+    ok = True
+    for (subject, body), recipients in groups.items():
+        try:
+            to = recipients[0] if len(recipients) == 1 else "undisclosed-recipients:;"
+            smtp_pool.send(sender, recipients, _render_message(skeleton, subject, to, body))
+        except Exception as e:
+            print("Email error:", e)
+            ok = False
+    return ok
+
+def send_email(notification: EmailNotification) -> bool:
+    return send_emails([notification])
+
+class BatchingEmailer:
+    """Buffers notifications on an asyncio queue and sends them in batches.
+
+    A worker coroutine flushes whenever ``max_batch`` notifications are waiting
+    or ``flush_interval_ms`` has passed since the first one arrived. Sends run
+    on a single dedicated thread so the whole batch shares one SMTP connection.
+    """
+
+    def __init__(self, max_batch: int = 50, flush_interval_ms: int = 200):
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval_ms / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def start(self) -> None:
+        self._queue = asyncio.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="email")
+        self._worker = asyncio.create_task(self._run())
+        self._worker.add_done_callback(self._log_worker_exit)
+
+    @staticmethod
+    def _log_worker_exit(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            print("Email worker stopped:", task.exception())
+
+    async def stop(self) -> None:
+        """Flush whatever is still queued, then stop the worker."""
+        if self._worker is None:
+            return
+        if not self._worker.done():
+            self._queue.put_nowait(None)
+            await asyncio.wait([self._worker])
+        self._executor.shutdown(wait=True)
+        self._queue = self._worker = self._executor = None
+
+    async def enqueue(self, notification: EmailNotification) -> None:
+        if self._worker is None or self._worker.done():
+            # Worker not running (e.g. app used without startup events, or it died), send directly
+            await run_in_threadpool(send_email, notification)
+            return
+        self._queue.put_nowait(notification)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            notification = await self._queue.get()
+            if notification is None:
+                break
+            batch = [notification]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    notification = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if notification is None:
+                    stopping = True
+                    break
+                batch.append(notification)
+            try:
+                await loop.run_in_executor(self._executor, send_emails, batch)
+            except Exception as e:
+                # Keep draining: one failed flush must not strand every later notification
+                print("Email error:", e)
+
+emailer = BatchingEmailer(
+    max_batch=SETTINGS.email_max_batch,
+    flush_interval_ms=SETTINGS.email_flush_interval_ms,
+)
+
+@app.on_event("startup")
+async def start_email_worker():
+    emailer.start()
+
+@app.on_event("shutdown")
+async def stop_email_worker():
+    await emailer.stop()
+    smtp_pool.shutdown()
+
+# ======== Response Caching ========
+
+# Room type listings and availability results are cached per key for a short TTL
+# and served with an ETag so repeat lookups skip MongoDB (or the body entirely).
+# The caches are per process: _invalidate_property only clears the worker that
+# handled the write, so with several workers (WEB_CONCURRENCY) the others may serve
+# the previous listing until their entry expires, i.e. for up to the 30s TTL.
+_room_types_cache: TTLCache = TTLCache(maxsize=1024, ttl=30)
+_availability_cache: TTLCache = TTLCache(maxsize=1024, ttl=30)
+_cache_lock = threading.Lock()
+
+def _etag(data) -> str:
+    payload = json.dumps(data, sort_keys=True, default=str).encode()
+    return f'"{hashlib.blake2b(payload, digest_size=8).hexdigest()}"'
+
+async def _cached(cache: TTLCache, key, load: Callable[[], Awaitable[Any]], dump: Callable[[Any], Any] = lambda v: v) -> Tuple[Any, str]:
+    """Return ``(value, etag)`` for ``key``, calling ``load`` on a miss."""
+    with _cache_lock:
+        entry = cache.get(key)
+    if entry is None:
+        value = await load()
+        entry = (value, _etag(dump(value)))
+        with _cache_lock:
+            cache[key] = entry
+    return entry
+
+def _not_modified(request: Request, response: Response, etag: str) -> Optional[Response]:
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return None
+
+_room_price_cache: TTLCache = TTLCache(maxsize=4096, ttl=60)
+
+_MISSING = object()
+
+async def _room_type_price(room_type_id: str) -> Optional[float]:
+    """Base nightly price for a room type, or None if it doesn't exist."""
+    with _cache_lock:
+        price = _room_price_cache.get(room_type_id, _MISSING)
+    if price is not _MISSING:
+        return price
+    projection = {"base_price": 1, "_id": 0}
+    db = get_db()
+    rt = await db["roomtype"].find_one({"_id": room_type_id}, projection)
+    if rt is None and ObjectId.is_valid(room_type_id):
+        # Room types created before string ids were introduced
+        rt = await db["roomtype"].find_one({"_id": ObjectId(room_type_id)}, projection)
+    price = float(rt.get("base_price", 0)) if rt else None
+    with _cache_lock:
+        _room_price_cache[room_type_id] = price
+    return price
+
+def _invalidate_property(property_id: str) -> None:
+    with _cache_lock:
+        _room_types_cache.pop(property_id, None)
+        _room_types_cache.pop(None, None)
+        for key in [k for k in _availability_cache.keys() if k[0] == property_id]:
+            _availability_cache.pop(key, None)
 
 # ======== Property and RoomType Management ========
 
+# Only fetch the fields the response models expose; documents written by OTA
+# integrations may carry extra ad-hoc fields.
+_PROPERTY_FIELDS = {field: 1 for field in Property.model_fields}
+_ROOM_TYPE_FIELDS = {field: 1 for field in RoomType.model_fields}
+_AVAILABILITY_FIELDS = {"name": 1, "description": 1, "max_guests": 1, "base_price": 1}
+
 @app.post("/api/properties", response_model=dict)
-def create_property(payload: CreatePropertyRequest):
-    property_id = create_document("property", payload)
+async def create_property(payload: CreatePropertyRequest):
+    property_id = await create_document("property", payload)
     return {"id": property_id}
 
-@app.get("/api/properties", response_model=List[Property])
-def list_properties():
-    return get_documents("property")
+@app.get("/api/properties", response_model=List[Property], response_model_exclude_unset=True)
+async def list_properties():
+    return await get_documents("property", projection=_PROPERTY_FIELDS)
 
 @app.post("/api/room-types", response_model=dict)
-def create_room_type(payload: CreateRoomTypeRequest):
-    room_type_id = create_document("roomtype", payload)
+async def create_room_type(payload: CreateRoomTypeRequest):
+    # Room types are keyed by a string _id so lookups don't need an ObjectId round-trip
+    room_type_id = await create_document("roomtype", {**payload.model_dump(), "_id": str(ObjectId())})
+    _invalidate_property(payload.property_id)
     return {"id": room_type_id}
 
-@app.get("/api/room-types", response_model=List[RoomType])
-def list_room_types(property_id: Optional[str] = None):
+@app.get("/api/room-types", response_model=List[RoomType], response_model_exclude_unset=True)
+async def list_room_types(request: Request, response: Response, property_id: Optional[str] = None):
     filt = {"property_id": property_id} if property_id else {}
-    return get_documents("roomtype", filt)
+    room_types, etag = await _cached(
+        _room_types_cache, property_id,
+        lambda: get_documents("roomtype", filt, projection=_ROOM_TYPE_FIELDS),
+    )
+    return _not_modified(request, response, etag) or room_types
 
 # ======== Availability Search ========
 
-@app.post("/api/availability", response_model=AvailabilityResult)
-def search_availability(payload: AvailabilitySearch):
+async def _load_availability(payload: AvailabilitySearch) -> AvailabilityResult:
     # Simple availability: all room types for the property are available with base price.
-    room_types = get_documents("roomtype", {"property_id": payload.property_id})
+    room_types = await get_documents(
+        "roomtype", {"property_id": payload.property_id}, projection=_AVAILABILITY_FIELDS
+    )
     items = []
     for rt in room_types:
-        items.append(AvailabilityResultItem(
+        # Stored room types were validated on insert, so skip revalidating them here
+        items.append(AvailabilityResultItem.model_construct(
             room_type_id=str(rt.get("_id")),
             name=rt.get("name"),
             description=rt.get("description"),
@@ -134,59 +526,19 @@ def search_availability(payload: AvailabilitySearch):
             nightly_price=float(rt.get("base_price", 0)),
             available=True
         ))
-    return AvailabilityResult(items=items)
-
-# ======== Reservation (Direct + OTA Webhook) ========
-
-@app.post("/api/reservations", response_model=dict)
-def create_reservation(payload: CreateReservationRequest):
-    # Price calculation: simple nightly price * nights
-    room = db["roomtype"].find_one({"_id": {"$eq": db.roomtype._Database__client.codec_options.document_class().from_dict({})}})
-    # Fallback: fetch by id string
-    from bson import ObjectId
-    rt = db["roomtype"].find_one({"_id": ObjectId(payload.room_type_id)})
-    if not rt:
-        raise HTTPException(status_code=404, detail="Room type not found")
-
-    nights = (payload.check_out - payload.check_in).days
-    if nights <= 0:
-        raise HTTPException(status_code=400, detail="check_out must be after check_in")
+    return AvailabilityResult.model_construct(items=items)
 
-    total_price = float(rt.get("base_price", 0)) * nights
-    confirmation_code = generate_confirmation_code()
-
-    reservation = Reservation(
-        property_id=payload.property_id,
-        room_type_id=payload.room_type_id,
-        check_in=payload.check_in,
-        check_out=payload.check_out,
-        guests=payload.guests,
-        total_price=total_price,
-        currency="USD",
-        channel="direct",
-        status="confirmed",
-        guest=payload.guest,
-        special_requests=payload.special_requests,
-        confirmation_code=confirmation_code,
+@app.post("/api/availability", response_model=AvailabilityResult)
+async def search_availability(payload: AvailabilitySearch, request: Request, response: Response):
+    key = (payload.property_id, payload.check_in, payload.check_out, payload.guests)
+    result, etag = await _cached(
+        _availability_cache, key,
+        lambda: _load_availability(payload),
+        lambda r: r.model_dump(mode="json"),
     )
-    res_id = create_document("reservation", reservation)
-
-    # Send email notification
-    to_email = os.getenv("BOOKING_NOTIFICATION_EMAIL", reservation.guest.email)
-    subject = f"New Reservation {confirmation_code}"
-    body = f"""
-    <h2>New Reservation</h2>
-    <p><strong>Confirmation:</strong> {confirmation_code}</p>
-    <p><strong>Property:</strong> {reservation.property_id}</p>
-    <p><strong>Room Type:</strong> {reservation.room_type_id}</p>
-    <p><strong>Dates:</strong> {reservation.check_in} to {reservation.check_out} ({nights} nights)</p>
-    <p><strong>Guest:</strong> {reservation.guest.first_name} {reservation.guest.last_name} ({reservation.guest.email})</p>
-    <p><strong>Total:</strong> {reservation.total_price} {reservation.currency}</p>
-    <p><strong>Channel:</strong> {reservation.channel}</p>
-    """
-    send_email(EmailNotification(to=to_email, subject=subject, body=body))
+    return _not_modified(request, response, etag) or result
 
-    return {"id": res_id, "confirmation_code": confirmation_code}
+# ======== Reservation (Direct + OTA Webhook) ========
 
 # OTA webhook endpoint (e.g., Booking.com, channel managers)
 class OTAWebhookPayload(BaseModel):
@@ -194,59 +546,93 @@ class OTAWebhookPayload(BaseModel):
     room_type_id: str
     check_in: date
     check_out: date
-    guests: int
+    guests: int = Field(..., ge=1)
     guest: ReservationGuest
-    total_price: Optional[float] = None
-    currency: Optional[str] = "USD"
+    total_price: Optional[float] = Field(None, ge=0)
+    currency: Optional[str] = Field("USD", min_length=3, max_length=3)
     channel: str = "booking.com"
     confirmation_code: Optional[str] = None
 
-@app.post("/api/ota/webhook", response_model=dict)
-def ota_webhook(payload: OTAWebhookPayload):
-    # Accept OTA pushes. If confirmation_code not provided, generate one.
-    confirmation_code = payload.confirmation_code or generate_confirmation_code("OTA")
+def _stay_nights(payload: Union[CreateReservationRequest, OTAWebhookPayload]) -> int:
     nights = (payload.check_out - payload.check_in).days
     if nights <= 0:
         raise HTTPException(status_code=400, detail="check_out must be after check_in")
+    return nights
+
+async def _persist_reservation(
+    payload: Union[CreateReservationRequest, OTAWebhookPayload],
+    *,
+    total_price: float,
+    confirmation_code: str,
+    channel: str,
+    currency: str = "USD",
+    special_requests: Optional[str] = None,
+) -> Tuple[str, dict]:
+    """Insert a confirmed reservation and return ``(id, document)``."""
+    # Request models carry Reservation's field constraints, so the payload is already
+    # validated; build the Reservation document directly
+    reservation = {
+        "property_id": payload.property_id,
+        "room_type_id": payload.room_type_id,
+        "check_in": payload.check_in,
+        "check_out": payload.check_out,
+        "guests": payload.guests,
+        "total_price": total_price,
+        "currency": currency,
+        "channel": channel,
+        "status": "confirmed",
+        "guest": payload.guest.model_dump(),
+        "special_requests": special_requests,
+        "confirmation_code": confirmation_code,
+    }
+    res_id = await create_document("reservation", reservation)
+    return res_id, reservation
+
+def _notify_reservation(background_tasks: BackgroundTasks, reservation: dict, nights: int, title: str) -> None:
+    """Queue the booking notification to be sent after the response is returned."""
+    subject = f"{title} {reservation['confirmation_code']}"
+    if reservation["channel"] != "direct":
+        subject += f" ({reservation['channel']})"
+    to_email = SETTINGS.booking_notification_email or reservation["guest"]["email"]
+    body = _RESERVATION_EMAIL_TMPL.render(title=title, res=reservation, nights=nights)
+    background_tasks.add_task(emailer.enqueue, EmailNotification(to=to_email, subject=subject, body=body))
+
+@app.post("/api/reservations")
+async def create_reservation(payload: CreateReservationRequest, background_tasks: BackgroundTasks):
+    # Price calculation: simple nightly price * nights
+    base_price = await _room_type_price(payload.room_type_id)
+    if base_price is None:
+        raise HTTPException(status_code=404, detail="Room type not found")
+    nights = _stay_nights(payload)
+
+    res_id, reservation = await _persist_reservation(
+        payload,
+        total_price=base_price * nights,
+        confirmation_code=generate_confirmation_code(),
+        channel="direct",
+        special_requests=payload.special_requests,
+    )
+    _notify_reservation(background_tasks, reservation, nights, "New Reservation")
+    return ORJSONResponse({"id": res_id, "confirmation_code": reservation["confirmation_code"]})
 
+@app.post("/api/ota/webhook")
+async def ota_webhook(payload: OTAWebhookPayload, background_tasks: BackgroundTasks):
+    # Accept OTA pushes. If confirmation_code not provided, generate one.
+    nights = _stay_nights(payload)
     # If total_price not provided, attempt simple calc from room type base_price
-    from bson import ObjectId
-    rt = db["roomtype"].find_one({"_id": ObjectId(payload.room_type_id)})
-    base_price = float(rt.get("base_price", 0)) if rt else 0.0
-    total_price = payload.total_price if payload.total_price is not None else base_price * nights
-
-    reservation = Reservation(
-        property_id=payload.property_id,
-        room_type_id=payload.room_type_id,
-        check_in=payload.check_in,
-        check_out=payload.check_out,
-        guests=payload.guests,
+    total_price = payload.total_price
+    if total_price is None:
+        total_price = (await _room_type_price(payload.room_type_id) or 0.0) * nights
+
+    res_id, reservation = await _persist_reservation(
+        payload,
         total_price=total_price,
-        currency=payload.currency or "USD",
+        confirmation_code=payload.confirmation_code or generate_confirmation_code("OTA"),
         channel=payload.channel,
-        status="confirmed",
-        guest=payload.guest,
-        special_requests=None,
-        confirmation_code=confirmation_code,
+        currency=payload.currency or "USD",
     )
-    res_id = create_document("reservation", reservation)
-
-    # Notify email
-    to_email = os.getenv("BOOKING_NOTIFICATION_EMAIL", reservation.guest.email)
-    subject = f"OTA Reservation {confirmation_code} ({payload.channel})"
-    body = f"""
-    <h2>OTA Reservation</h2>
-    <p><strong>Channel:</strong> {payload.channel}</p>
-    <p><strong>Confirmation:</strong> {confirmation_code}</p>
-    <p><strong>Property:</strong> {reservation.property_id}</p>
-    <p><strong>Room Type:</strong> {reservation.room_type_id}</p>
-    <p><strong>Dates:</strong> {reservation.check_in} to {reservation.check_out} ({nights} nights)</p>
-    <p><strong>Guest:</strong> {reservation.guest.first_name} {reservation.guest.last_name} ({reservation.guest.email})</p>
-    <p><strong>Total:</strong> {reservation.total_price} {reservation.currency}</p>
-    """
-    send_email(EmailNotification(to=to_email, subject=subject, body=body))
-
-    return {"id": res_id, "confirmation_code": confirmation_code}
+    _notify_reservation(background_tasks, reservation, nights, "OTA Reservation")
+    return ORJSONResponse({"id": res_id, "confirmation_code": reservation["confirmation_code"]})
 
 # Health for schemas viewer
 @app.get("/schema")
@@ -262,4 +648,14 @@ def get_schema_names():
 if __name__ == "__main__":
     import uvicorn
     port = int(os.getenv("PORT", 8000))
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    # Multiple workers need the app as an import string; each worker builds its own
+    # Mongo client and SMTP pool in the startup hooks. Response caches are per worker
+    # too, so a new room type can take up to their TTL to appear on every worker.
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=port,
+        loop="uvloop",
+        http="httptools",
+        workers=int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 2)),
+    )
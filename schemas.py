@@ -62,7 +62,7 @@ class CreateReservationRequest(BaseModel):
     room_type_id: str
     check_in: date
     check_out: date
-    guests: int
+    guests: int = Field(..., ge=1)
     guest: ReservationGuest
     special_requests: Optional[str] = None
 
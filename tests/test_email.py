@@ -0,0 +1,168 @@
+"""
+Wire-format tests for the notification mailer.
+
+Messages are rendered by hand in main.py, so these send them through smtplib
+to a small in-process SMTP server and parse what actually arrives.
+"""
+
+import asyncio
+import dataclasses
+import re
+import socketserver
+import threading
+from email import message_from_bytes, policy
+
+import pytest
+
+import main
+from schemas import EmailNotification
+
+
+class _StubSMTPHandler(socketserver.StreamRequestHandler):
+    def _reply(self, line: str) -> None:
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def handle(self):
+        envelope = None
+        self._reply("220 stub ESMTP")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode("utf-8").rstrip("\r\n")
+            verb = command.split(" ", 1)[0].upper()
+            if verb == "EHLO":
+                extensions = ["stub", "8BITMIME"] + (["SMTPUTF8"] if self.server.smtputf8 else [])
+                for ext in extensions[:-1]:
+                    self._reply(f"250-{ext}")
+                self._reply(f"250 {extensions[-1]}")
+            elif verb == "MAIL":
+                match = re.match(r"MAIL FROM:<(.*)>\s*(.*)", command, re.I)
+                envelope = {"from": match.group(1), "options": match.group(2).split(), "to": []}
+                self._reply("250 OK")
+            elif verb == "RCPT":
+                envelope["to"].append(re.match(r"RCPT TO:<(.*)>", command, re.I).group(1))
+                self._reply("250 OK")
+            elif verb == "DATA":
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+                data = b""
+                for chunk in iter(self.rfile.readline, b".\r\n"):
+                    data += chunk[1:] if chunk.startswith(b"..") else chunk
+                envelope["data"] = data
+                self.server.messages.append(envelope)
+                self._reply("250 OK")
+            elif verb == "QUIT":
+                self._reply("221 Bye")
+                return
+            else:
+                self._reply("250 OK")
+
+
+@pytest.fixture
+def smtp_server(monkeypatch):
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), _StubSMTPHandler)
+    server.daemon_threads = True
+    server.messages = []
+    server.smtputf8 = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    host, port = server.server_address
+    monkeypatch.setattr(main, "SETTINGS", dataclasses.replace(main.SETTINGS, smtp_host=host, smtp_port=port))
+    pool = main.SMTPConnectionPool(host, port, None, None)
+    monkeypatch.setattr(main, "smtp_pool", pool)
+    # The stub speaks plain SMTP; TLS negotiation isn't what's under test
+    monkeypatch.setattr(main.smtplib.SMTP, "starttls", lambda self, *args, **kwargs: (220, b""))
+
+    yield server
+
+    pool.shutdown()
+    server.shutdown()
+    server.server_close()
+
+
+def _parse(envelope):
+    return message_from_bytes(envelope["data"], policy=policy.default)
+
+
+def test_batch_collapses_identical_messages(smtp_server):
+    ok = main.send_emails([
+        EmailNotification(to="a@example.com", subject="New Reservation RES-1", body="<p>Zoë</p>"),
+        EmailNotification(to="b@example.com", subject="New Reservation RES-1", body="<p>Zoë</p>"),
+        EmailNotification(to="c@example.com", subject="Café RES-2", body="<p>x</p>"),
+    ])
+
+    assert ok
+    shared, single = smtp_server.messages
+    assert shared["from"] == "no-reply@example.com"
+    assert shared["to"] == ["a@example.com", "b@example.com"]
+    assert shared["options"] == []
+    msg = _parse(shared)
+    assert msg["To"] == "undisclosed-recipients:;"
+    assert msg["Bcc"] is None
+    assert msg["Subject"] == "New Reservation RES-1"
+    assert msg.get_content() == "<p>Zoë</p>"
+
+    msg = _parse(single)
+    assert single["to"] == ["c@example.com"]
+    assert msg["To"] == "c@example.com"
+    assert msg["Subject"] == "Café RES-2"
+
+
+def test_non_ascii_sender_and_recipients(smtp_server, monkeypatch):
+    monkeypatch.setattr(main, "SETTINGS", dataclasses.replace(main.SETTINGS, smtp_sender="Hôtel <bookings@example.com>"))
+
+    ok = main.send_emails([
+        EmailNotification(to="jöhn@example.com", subject="New Reservation RES-1", body="x"),
+        EmailNotification(to="a@bücher.de", subject="New Reservation RES-2", body="x"),
+    ])
+
+    assert ok
+    utf8_mailbox, idna_domain = smtp_server.messages
+    assert utf8_mailbox["to"] == ["jöhn@example.com"]
+    assert utf8_mailbox["options"] == ["SMTPUTF8"]
+    assert _parse(utf8_mailbox)["To"] == "jöhn@example.com"
+
+    assert idna_domain["to"] == ["a@xn--bcher-kva.de"]
+    assert idna_domain["options"] == []
+    msg = _parse(idna_domain)
+    assert idna_domain["from"] == "bookings@example.com"
+    assert msg["From"].addresses[0].display_name == "Hôtel"
+    assert msg["From"].addresses[0].addr_spec == "bookings@example.com"
+
+
+def test_non_ascii_mailbox_without_smtputf8_fails_alone(smtp_server):
+    smtp_server.smtputf8 = False
+
+    ok = main.send_emails([
+        EmailNotification(to="jöhn@example.com", subject="New Reservation RES-1", body="x"),
+        EmailNotification(to="a@example.com", subject="New Reservation RES-2", body="x"),
+    ])
+
+    assert not ok
+    assert [m["to"] for m in smtp_server.messages] == [["a@example.com"]]
+
+
+def test_batching_worker_survives_failed_flush(monkeypatch, capsys):
+    delivered = []
+
+    def send_emails(batch):
+        if not delivered:
+            delivered.append(None)
+            raise RuntimeError("boom")
+        delivered.extend(n.to for n in batch)
+        return True
+
+    monkeypatch.setattr(main, "send_emails", send_emails)
+    emailer = main.BatchingEmailer(max_batch=1, flush_interval_ms=10)
+
+    async def run():
+        emailer.start()
+        await emailer.enqueue(EmailNotification(to="a@example.com", subject="s", body="b"))
+        await asyncio.sleep(0.1)
+        await emailer.enqueue(EmailNotification(to="b@example.com", subject="s", body="b"))
+        await emailer.stop()
+
+    asyncio.run(run())
+
+    assert delivered == [None, "b@example.com"]
+    assert "Email error: boom" in capsys.readouterr().out
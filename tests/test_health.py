@@ -0,0 +1,56 @@
+"""
+Tests for the cached health and readiness probes.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+
+class _FakeDB:
+    name = "booking"
+
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.calls = 0
+
+    async def list_collection_names(self):
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError("connection refused")
+        return ["property", "roomtype"]
+
+
+@pytest.fixture
+def client():
+    # Startup hooks aren't run (no context manager), so no real database is touched
+    main._health_cache.clear()
+    yield TestClient(main.app)
+    main._health_cache.clear()
+
+
+def test_readyz_ready_and_probe_shared(client, monkeypatch):
+    db = _FakeDB()
+    monkeypatch.setattr(main, "get_db", lambda: db)
+
+    first = client.get("/test")
+    assert first.status_code == 200
+    assert client.get("/test", headers={"If-None-Match": first.headers["etag"]}).status_code == 304
+    assert client.get("/readyz").json() == {"status": "ready"}
+    assert db.calls == 1
+
+
+def test_readyz_unavailable_on_query_error(client, monkeypatch):
+    monkeypatch.setattr(main, "get_db", lambda: _FakeDB(fail=True))
+
+    response = client.get("/readyz")
+    assert response.status_code == 503
+    assert response.json()["status"] == "unavailable"
+
+
+def test_readyz_unavailable_without_database(client, monkeypatch):
+    monkeypatch.setattr(main, "get_db", lambda: None)
+
+    assert client.get("/readyz").status_code == 503
+    assert client.get("/livez").json() == {"status": "ok"}
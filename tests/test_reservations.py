@@ -0,0 +1,69 @@
+"""
+Request validation tests for the reservation endpoints.
+
+Reservations are persisted as plain dicts, so the request models are the only
+place their field constraints are enforced.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+
+GUEST = {"first_name": "Ada", "last_name": "Lovelace", "email": "ada@example.com"}
+BOOKING = {
+    "property_id": "p1",
+    "room_type_id": "rt1",
+    "check_in": "2026-01-01",
+    "check_out": "2026-01-03",
+    "guests": 2,
+    "guest": GUEST,
+}
+
+
+@pytest.fixture
+def inserted(monkeypatch):
+    documents = []
+
+    async def create_document(collection_name, data):
+        documents.append((collection_name, data))
+        return "res1"
+
+    async def room_type_price(room_type_id):
+        return 100.0
+
+    monkeypatch.setattr(main, "create_document", create_document)
+    monkeypatch.setattr(main, "_room_type_price", room_type_price)
+    return documents
+
+
+@pytest.fixture
+def client():
+    # Startup hooks aren't run (no context manager), so emails go out directly
+    return TestClient(main.app)
+
+
+@pytest.mark.parametrize("path, payload", [
+    ("/api/reservations", {**BOOKING, "guests": 0}),
+    ("/api/ota/webhook", {**BOOKING, "guests": -3}),
+    ("/api/ota/webhook", {**BOOKING, "total_price": -50}),
+    ("/api/ota/webhook", {**BOOKING, "currency": "EURO!"}),
+    ("/api/ota/webhook", {**BOOKING, "currency": "EU"}),
+])
+def test_invalid_reservation_is_rejected(client, inserted, path, payload):
+    response = client.post(path, json=payload)
+
+    assert response.status_code == 422
+    assert inserted == []
+
+
+def test_valid_reservations_are_persisted(client, inserted):
+    assert client.post("/api/reservations", json=BOOKING).status_code == 200
+    ota = client.post("/api/ota/webhook", json={**BOOKING, "total_price": 180, "currency": "EUR"})
+    assert ota.status_code == 200
+
+    (_, direct), (_, pushed) = inserted
+    assert direct["total_price"] == 200.0
+    assert pushed["total_price"] == 180
+    assert pushed["currency"] == "EUR"